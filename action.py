@@ -9,8 +9,9 @@ import sys
 from src.volary_analyzer.analyze import analyze
 from src.volary_analyzer.completion_api import CompletionApi
 from src.volary_analyzer.eval import eval
+from src.volary_analyzer.output_schemas import TechDebtAnalysis
 from src.volary_analyzer.print_issues import print_issues, render_summary_markdown
-from src.volary_analyzer.tools import ls_all
+from src.volary_analyzer.tools import RepoFileIndex
 
 DEFAULT_COMPLETION_ENDPOINT = "https://openrouter.ai/api/v1/chat/completions"
 DEFAULT_COORDINATOR_MODEL = "openai/gpt-5.1"
@@ -58,12 +59,23 @@ def main() -> int:
     revision = os.environ.get("GITHUB_SHA")
     repo = os.environ.get("GITHUB_REPOSITORY")
 
+    analysis_cache_file = None
+    if revision and os.environ.get("INPUT_CACHE-ANALYSIS", "").lower() == "true":
+        analysis_cache_file = os.path.join(cache_dir, f"analysis-{revision}.json")
+
     try:
-        analysis = analyze(
-            api=api,
-            coordinator_model=coordinator_model,
-            delegate_model=delegate_model,
-        )
+        if analysis_cache_file and os.path.exists(analysis_cache_file):
+            print(f"Using cached analysis for {revision}")
+            with open(analysis_cache_file) as f:
+                analysis = TechDebtAnalysis.model_validate_json(f.read())
+        else:
+            analysis = analyze(
+                api=api,
+                coordinator_model=coordinator_model,
+                delegate_model=delegate_model,
+            )
+            if analysis_cache_file:
+                _write_atomic(analysis_cache_file, analysis.model_dump_json(indent=2))
         evaluated_analysis = eval(
             api=api,
             analysis=analysis,
@@ -72,9 +84,8 @@ def main() -> int:
             search_model=delegate_model,
         )
         print_issues(evaluated_analysis)
-        files = set(ls_all("**/*"))
         with open(summary_output, "a") as f:
-            f.write(render_summary_markdown(evaluated_analysis, repo=repo, revision=revision, files=files))
+            f.write(render_summary_markdown(evaluated_analysis, repo=repo, revision=revision, files=RepoFileIndex()))
         api.print_usage_summary()
         print("Analysis complete!")
 
@@ -85,5 +96,14 @@ def main() -> int:
         return 1
 
 
+def _write_atomic(path: str, content: str) -> None:
+    """Writes a file such that readers never see it partially written (e.g. if the run is cancelled)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -5,7 +5,7 @@ Analyzer agent - generates technical debt issues from a codebase.
 import json
 from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import (
     Self,
     TypedDict,
@@ -23,6 +23,22 @@ TBaseModel = TypeVar("TBaseModel", bound=BaseModel)
 
 _UPDATE_USER_FUNC_NAME = "update_user"
 _SET_TODOS_FUNC_NAME = "set_todos"
+_PSEUDO_TOOL_NAMES = frozenset({_UPDATE_USER_FUNC_NAME, _SET_TODOS_FUNC_NAME})
+
+_MAX_PARALLEL_TOOL_CALLS = 10
+
+_ELIDED_TOOL_RESULT = "[Earlier tool result removed to save context. Call the tool again if you still need it.]"
+
+_TODO_STATUS_MARKERS = {
+    "pending": "[ ]",
+    "in_progress": "[→]",
+    "completed": "[✓]",
+}
+_TODO_STATUS_COLORS = {
+    "pending": "white",
+    "in_progress": "yellow",
+    "completed": "green",
+}
 
 console = Console(stderr=True)
 
@@ -70,12 +86,16 @@ def update_user(msg: str) -> None:
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolFunction:
     """Represents the function part of a tool call."""
 
     name: str
     arguments: str  # JSON string
+    parsed_arguments: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.parsed_arguments = json.loads(self.arguments)
 
     @classmethod
     def from_dict(cls, data: dict) -> Self:
@@ -83,7 +103,7 @@ class ToolFunction:
         return cls(name=data["name"], arguments=data["arguments"])
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """Represents a tool call from the LLM."""
 
@@ -109,7 +129,7 @@ class ToolMessage(TypedDict):
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallResult:
     """Result of executing a single tool call."""
 
@@ -130,7 +150,7 @@ class ToolCallResult:
     @property
     def tool_args(self) -> dict:
         """Get the parsed tool arguments."""
-        return json.loads(self.call.function.arguments)
+        return self.call.function.parsed_arguments
 
 
 class TODO(TypedDict):
@@ -140,7 +160,15 @@ class TODO(TypedDict):
     status: str  # "pending", "in_progress", or "completed"
 
 
-@dataclass
+def _todo_reminder(todos: list[TODO] | None) -> str:
+    """Renders the reminder of the current TODO list that's sent to the agent each turn."""
+    if not todos:
+        return "Reminder: you currently have no items in your TODO list"
+    todo_summary = [f"{_TODO_STATUS_MARKERS.get(todo['status'], '[ ]')} {todo['content']}" for todo in todos]
+    return "Reminder: You are currently doing the following:\n" + "\n".join(todo_summary)
+
+
+@dataclass(slots=True)
 class Agent:
     instruction: str
     tools: list[Callable]
@@ -150,18 +178,47 @@ class Agent:
     todos: list = None
     max_iterations: int = 50
     max_retries_on_empty: int = 2  # Number of times to retry on empty response
+    # Tool results are resent with every later request, so cap how much of the context window one can take up
+    max_tool_result_chars: int = 100_000
+    # Roughly 4 characters per token, leaving headroom in a 200k token context window
+    max_context_chars: int = 600_000
     task: str = ""
+    messages: list[dict] = field(init=False, repr=False)
+    _executor: ThreadPoolExecutor | None = field(init=False, repr=False)
+    _tool_map: dict[str, Callable] = field(init=False, repr=False)
+    _api_tools: list[Callable] = field(init=False, repr=False)
+    _reminder: str = field(init=False, repr=False)
 
     def __post_init__(self):
         # Store messages from last run for continuation
         self.messages = []
+        self._executor = None
+
+        self._tool_map = {tool.__name__: tool for tool in self.tools}
+        # Add set_todos as a special method-based tool
+        self._tool_map[_SET_TODOS_FUNC_NAME] = self.set_todos
+        self._api_tools = self.tools + [self.set_todos, update_user]
+        self._reminder = _todo_reminder(self.todos)
+
+    def _tool_executor(self) -> ThreadPoolExecutor:
+        """Returns the pool tool calls are run on, kept for the whole run rather than recreated every turn."""
+        if self._executor is None:
+            # Each agent needs its own pool: delegate agents block on their own tool calls while running on the
+            # parent's pool, so sharing one could deadlock.
+            self._executor = ThreadPoolExecutor(
+                max_workers=_MAX_PARALLEL_TOOL_CALLS, thread_name_prefix=self.agent_name.replace(" ", "-")
+            )
+        return self._executor
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     def _call_tool(self, tool: Callable, tool_call: ToolCall) -> ToolCallResult:
         """Execute a single tool call and return the result."""
-        tool_args = json.loads(tool_call.function.arguments)
-
         try:
-            tool_result = tool(**tool_args)
+            tool_result = tool(**tool_call.function.parsed_arguments)
 
             # Convert result to string if needed
             if isinstance(tool_result, str):
@@ -169,6 +226,13 @@ class Agent:
             else:
                 content = json.dumps(tool_result)
 
+            if len(content) > self.max_tool_result_chars:
+                content = (
+                    f"{content[: self.max_tool_result_chars]}\n\n[... truncated "
+                    f"{len(content) - self.max_tool_result_chars} characters. Narrow the request (e.g. a line range) "
+                    f"to see the rest]"
+                )
+
             return ToolCallResult(
                 call=tool_call,
                 message={
@@ -189,19 +253,14 @@ class Agent:
                 },
             )
 
-    def _maybe_update_user(self, tool_calls: list[ToolCall]) -> None:
-        update_user_call = next(
-            (tool_call for tool_call in tool_calls if tool_call.function.name == _UPDATE_USER_FUNC_NAME),
-            None,  # default if no match
-        )
+    def _maybe_update_user(self, update_user_call: ToolCall | None) -> None:
         if not update_user_call:
             return
 
-        tool_args = json.loads(update_user_call.function.arguments)
         tool_id = update_user_call.id
 
         # Print the user update in bold white
-        msg = tool_args.get("msg", "")
+        msg = update_user_call.function.parsed_arguments.get("msg", "")
         if msg:
             console.print(f"\n[bold white]{escape(msg)}[/bold white]")
 
@@ -214,12 +273,8 @@ class Agent:
             }
         )
 
-    def _maybe_set_todos(self, tool_calls: list[ToolCall]) -> None:
+    def _maybe_set_todos(self, set_todos_call: ToolCall | None) -> None:
         """Handle set_todos pseudo-tool calls."""
-        set_todos_call = next(
-            (tool_call for tool_call in tool_calls if tool_call.function.name == _SET_TODOS_FUNC_NAME),
-            None,  # default if no match
-        )
         if not set_todos_call:
             return
 
@@ -228,86 +283,101 @@ class Agent:
 
         self._render_todos()
 
+    def _elide_old_tool_results(self) -> None:
+        """
+        Replaces the oldest tool results with a placeholder once the history grows past max_context_chars. Results
+        from the latest turn are always kept.
+        """
+        size = sum(len(message.get("content") or "") for message in self.messages)
+        if size <= self.max_context_chars:
+            return
+
+        last_assistant = max(
+            (i for i, message in enumerate(self.messages) if message["role"] == "assistant"),
+            default=len(self.messages),
+        )
+        # Trim down to half the budget, so that this (and the prompt cache miss that comes with it) doesn't happen on
+        # every turn from here on
+        for i in range(last_assistant):
+            if size <= self.max_context_chars // 2:
+                break
+            message = self.messages[i]
+            if message["role"] != "tool" or message["content"] == _ELIDED_TOOL_RESULT:
+                continue
+            size -= len(message["content"]) - len(_ELIDED_TOOL_RESULT)
+            self.messages[i] = {**message, "content": _ELIDED_TOOL_RESULT}
+
     def _call_tools(self, tool_calls_raw: list[dict]) -> None:
         """Execute tool calls from the LLM."""
-        tool_calls = [ToolCall.from_dict(tc) for tc in tool_calls_raw]
-
-        tool_map = {tool.__name__: tool for tool in self.tools}
-        # Add set_todos as a special method-based tool
-        tool_map["set_todos"] = self.set_todos
+        # Split out pseudo-tools like update_user and set_todos from the actual tool calls
+        pseudo_tool_calls: dict[str, ToolCall] = {}
+        actual_tool_calls = []
+        for tc_raw in tool_calls_raw:
+            tc = ToolCall.from_dict(tc_raw)
+            if tc.function.name in _PSEUDO_TOOL_NAMES:
+                # Only the first call to each pseudo-tool is handled
+                pseudo_tool_calls.setdefault(tc.function.name, tc)
+            else:
+                actual_tool_calls.append(tc)
 
         # Handle pseudo-tools first (they print before actual tool execution logs)
-        self._maybe_update_user(tool_calls)
-        self._maybe_set_todos(tool_calls)
-
-        # Filter to actual tool calls (excluding pseudo-tools like delegate_task, update_user, and set_todos)
-        actual_tool_calls = [
-            tc for tc in tool_calls if tc.function.name not in [_UPDATE_USER_FUNC_NAME, _SET_TODOS_FUNC_NAME]
-        ]
+        if pseudo_tool_calls:
+            self._maybe_update_user(pseudo_tool_calls.get(_UPDATE_USER_FUNC_NAME))
+            self._maybe_set_todos(pseudo_tool_calls.get(_SET_TODOS_FUNC_NAME))
 
-        if len(actual_tool_calls) == 0:
+        if not actual_tool_calls:
             return
 
-        results = []
-        tool_call_futures = []
-        with ThreadPoolExecutor(max_workers=min(len(actual_tool_calls), 10)) as executor:
-            for tc in actual_tool_calls:
-                tool = tool_map.get(tc.function.name)
-                if not tool:
-                    results.append(
-                        ToolCallResult(
-                            call=tc,
-                            error=Exception(f"No tool called {tc.function.name}"),
-                            message={
-                                "role": "tool",
-                                "tool_call_id": tc.id,
-                                "content": f"Error: Unknown tool '{tc.function.name}'. Available tools: {', '.join(tool_map.keys())}",
-                            },
-                        )
-                    )
-                else:
-                    tool_call_futures.append(executor.submit(self._call_tool, tool, tc))
-
-            # TODO(jon): Better timeouts: we have 2 classes of tool calls: basic tool, and sub-agents, which have
-            #  different expectations. The 4 mins here seems like it would catch an obviously erroneous run at least.
-            for future in as_completed(tool_call_futures, timeout=240.0):
-                result = future.result()
-                results.append(result)
-
-            results.sort(key=lambda r: r.tool_id)
-            for result in results:
-                task_prefix = f"[{self.task}] " if self.task else ""
-                console.print(f"\n[dim]{task_prefix}Executing tool: {result.tool_name}[/dim]")
-                console.print(f"[dim]Arguments: {json.dumps(result.tool_args, indent=2)}[/dim]")
-
-                if result.error:
-                    console.print(f"[dim red]Error: {result.error}[/dim red]")
-                else:
-                    result_preview = result.message["content"][:200]
-                    console.print(
-                        f"[dim]Result: {escape(result_preview)}{'...' if len(result.message['content']) > 200 else ''}[/dim]"
-                    )
+        executor = self._tool_executor()
+        # Results are kept in the order the LLM made the calls in
+        results: list[ToolCallResult | None] = [None] * len(actual_tool_calls)
+        future_to_index = {}
+        for i, tc in enumerate(actual_tool_calls):
+            tool = self._tool_map.get(tc.function.name)
+            if not tool:
+                results[i] = ToolCallResult(
+                    call=tc,
+                    error=Exception(f"No tool called {tc.function.name}"),
+                    message={
+                        "role": "tool",
+                        "tool_call_id": tc.id,
+                        "content": f"Error: Unknown tool '{tc.function.name}'. Available tools: {', '.join(self._tool_map.keys())}",
+                    },
+                )
+            else:
+                future_to_index[executor.submit(self._call_tool, tool, tc)] = i
+
+        # TODO(jon): Better timeouts: we have 2 classes of tool calls: basic tool, and sub-agents, which have
+        #  different expectations. The 4 mins here seems like it would catch an obviously erroneous run at least.
+        for future in as_completed(future_to_index, timeout=240.0):
+            results[future_to_index[future]] = future.result()
+
+        task_prefix = f"[{self.task}] " if self.task else ""
+        for result in results:
+            if result.error:
+                outcome = f"[dim red]Error: {result.error}[/dim red]"
+            else:
+                result_preview = result.message["content"][:200]
+                outcome = f"[dim]Result: {escape(result_preview)}{'...' if len(result.message['content']) > 200 else ''}[/dim]"
+            console.print(
+                f"\n[dim]{task_prefix}Executing tool: {result.tool_name}[/dim]\n"
+                f"[dim]Arguments: {json.dumps(result.tool_args, indent=2)}[/dim]\n"
+                f"{outcome}"
+            )
 
-            self.messages.extend([r.message for r in results])
+        self.messages.extend([r.message for r in results])
 
     def _render_todos(self) -> None:
         """Render the current TODO list to the console."""
-        console.print("\n[bold cyan]TODO List:[/bold cyan]")
+        lines = ["\n[bold cyan]TODO List:[/bold cyan]"]
         if self.todos:
             for todo in self.todos:
-                status_marker = {
-                    "pending": "[ ]",
-                    "in_progress": "[→]",
-                    "completed": "[✓]",
-                }.get(todo["status"], "[ ]")
-                status_color = {
-                    "pending": "white",
-                    "in_progress": "yellow",
-                    "completed": "green",
-                }.get(todo["status"], "white")
-                console.print(f"  [{status_color}]{status_marker} {escape(todo['content'])}[/{status_color}]")
+                status_marker = _TODO_STATUS_MARKERS.get(todo["status"], "[ ]")
+                status_color = _TODO_STATUS_COLORS.get(todo["status"], "white")
+                lines.append(f"  [{status_color}]{status_marker} {escape(todo['content'])}[/{status_color}]")
         else:
-            console.print("  [dim](empty)[/dim]")
+            lines.append("  [dim](empty)[/dim]")
+        console.print("\n".join(lines))
 
     def set_todos(self, todos: list[TODO]) -> str:
         """
@@ -321,6 +391,7 @@ class Agent:
         :return: Confirmation message
         """
         self.todos = todos
+        self._reminder = _todo_reminder(todos)
         return f"TODO list updated with {len(todos)} items"
 
     def _run(
@@ -355,85 +426,67 @@ class Agent:
         if self.task:
             console.print(f"\n[bold cyan]Task: {escape(self.task)}[/bold cyan]")
 
-        # Prepare response_format if output_schema is provided
-        response_format = None
-        if output_schema:
-            response_format = {"type": "json_schema", "json_schema": output_schema}
-        # Call the agent in a loop until the finish reason isn't a tool call.
-        for iteration in range(self.max_iterations):
-            if self.todos:
-                todo_summary = []
-                for todo in self.todos:
-                    status_marker = {
-                        "pending": "[ ]",
-                        "in_progress": "[→]",
-                        "completed": "[✓]",
-                    }.get(todo["status"], "[ ]")
-                    todo_summary.append(f"{status_marker} {todo['content']}")
-
-                self.messages.append(
-                    {
-                        "role": "system",
-                        "content": "Reminder: You are currently doing the following:\n" + "\n".join(todo_summary),
-                    }
-                )
-            else:
-                self.messages.append(
-                    {
-                        "role": "system",
-                        "content": "Reminder: you currently have no items in your TODO list",
-                    }
+        # Everything but the messages stays the same for each request in the run
+        complete_kwargs = {
+            "agent_name": self.agent_name,
+            "model": self.model,
+            "system_prompt": self.instruction,
+            "tools": self._api_tools,
+            "response_format": {"type": "json_schema", "json_schema": output_schema} if output_schema else None,
+        }
+        try:
+            # Call the agent in a loop until the finish reason isn't a tool call.
+            for iteration in range(self.max_iterations):
+                self._elide_old_tool_results()
+
+                # The reminder is only sent with this request rather than kept in the history, so they don't pile up
+                # and the history stays a stable prefix for prompt caching. It's a user message because some providers
+                # fold system messages into the system prompt, which would invalidate the cache whenever it changed.
+                result = self.api.complete(
+                    messages=self.messages + [{"role": "user", "content": self._reminder}], **complete_kwargs
                 )
 
-            # Call the API with response_format from the start
-            result = self.api.complete(
-                agent_name=self.agent_name,
-                model=self.model,
-                system_prompt=self.instruction,
-                tools=self.tools + [self.set_todos, update_user],
-                messages=self.messages,
-                response_format=response_format,
-            )
+                first_choice = result["choices"][0]
+                assistant_message = first_choice["message"]
+                self.messages.append(assistant_message)
 
-            first_choice = result["choices"][0]
-            assistant_message = first_choice["message"]
-            self.messages.append(assistant_message)
-
-            finish_reason = first_choice.get("finish_reason")
-            tool_calls = assistant_message.get("tool_calls")
-
-            if finish_reason == "stop":
-                # No more tool calling to do. Return the response.
-                content = assistant_message.get("content", "")
-                if not content:
-                    raise EmptyResponseError(
-                        f"Agent completed but returned an empty response. "
-                        f"Finish reason: {finish_reason}, Iterations: {iteration + 1}"
-                    )
-
-                return content
-            elif finish_reason == "tool_calls":
-                # Print reasoning if present (from extended thinking models)
-                reasoning = assistant_message.get("reasoning")
-                if reasoning:
-                    console.print("\n[dim cyan]Reasoning:[/dim cyan]")
-                    console.print(f"[dim italic]{escape(reasoning)}[/dim italic]")
-
-                if assistant_message.get("content"):
-                    console.print(f"\n[bold white]{escape(assistant_message['content'])}[/bold white]")
-
-                self._call_tools(tool_calls)
-            else:
-                # Probably the error or length reasons
-                raise BadFinishReasonError(finish_reason)
-        # Reached max iterations without completing
-        console.print(f"\n[dim]Reached maximum iterations ({self.max_iterations})[/dim]")
-        last_message = self.messages[-1] if self.messages else None
-        raise MaxIterationsReachedError(
-            f"Agent reached maximum iterations ({self.max_iterations}) without completing. "
-            f"Last message finish reason: {last_message.get('finish_reason') if last_message else 'N/A'}. "
-            f"Consider increasing max_iterations or checking if the agent is stuck in a loop."
-        )
+                finish_reason = first_choice.get("finish_reason")
+                tool_calls = assistant_message.get("tool_calls")
+
+                if finish_reason == "stop":
+                    # No more tool calling to do. Return the response.
+                    content = assistant_message.get("content", "")
+                    if not content:
+                        raise EmptyResponseError(
+                            f"Agent completed but returned an empty response. "
+                            f"Finish reason: {finish_reason}, Iterations: {iteration + 1}"
+                        )
+
+                    return content
+                elif finish_reason == "tool_calls":
+                    # Print reasoning if present (from extended thinking models)
+                    reasoning = assistant_message.get("reasoning")
+                    if reasoning:
+                        console.print("\n[dim cyan]Reasoning:[/dim cyan]")
+                        console.print(f"[dim italic]{escape(reasoning)}[/dim italic]")
+
+                    if assistant_message.get("content"):
+                        console.print(f"\n[bold white]{escape(assistant_message['content'])}[/bold white]")
+
+                    self._call_tools(tool_calls)
+                else:
+                    # Probably the error or length reasons
+                    raise BadFinishReasonError(finish_reason)
+            # Reached max iterations without completing
+            console.print(f"\n[dim]Reached maximum iterations ({self.max_iterations})[/dim]")
+            last_message = self.messages[-1] if self.messages else None
+            raise MaxIterationsReachedError(
+                f"Agent reached maximum iterations ({self.max_iterations}) without completing. "
+                f"Last message finish reason: {last_message.get('finish_reason') if last_message else 'N/A'}. "
+                f"Consider increasing max_iterations or checking if the agent is stuck in a loop."
+            )
+        finally:
+            self._shutdown_executor()
 
     @overload
     def run(self, task: str = "", prompt: str = "", should_continue: bool = False) -> str:
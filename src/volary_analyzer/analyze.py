@@ -1,7 +1,13 @@
+import os
+
 from .agent import Agent, CompletionApi, console
 from .output_schemas import TechDebtAnalysis
 from .prompts import ANALYZER_PROMPT, START_ANALYSIS_PROMPT
-from .tools import delegate_tool_factory, grep, ls, read_file, web_answers_tool_factory
+from .tools import _should_ignore, delegate_tool_factory, grep, ls, read_file, web_answers_tool_factory
+
+# The repo context is sent to the coordinator and every delegate, so long docs are cut down to their start and end
+_MAX_DOC_CHARS = 16_000
+_DOC_TAIL_CHARS = 4_000
 
 
 def analyze(
@@ -52,7 +58,7 @@ def get_repo_context(readme_md: str = "README.md", claude_md: str = "CLAUDE.md",
 
     # Get top-level directory listing
     try:
-        top_level = ls("*")
+        top_level = _top_level_entries()
         if top_level:
             context_parts += [
                 "## Repository Structure (top-level)",
@@ -60,7 +66,7 @@ def get_repo_context(readme_md: str = "README.md", claude_md: str = "CLAUDE.md",
                 "\n".join(top_level),
                 "```",
             ]
-    except Exception:
+    except OSError:
         pass
 
     headers = {
@@ -73,7 +79,7 @@ def get_repo_context(readme_md: str = "README.md", claude_md: str = "CLAUDE.md",
     for filename in [readme_md, claude_md, agents_md]:
         try:
             with open(filename) as f:
-                content = f.read()
+                content = _truncate_doc(f.read())
             context_parts += [
                 "\n## " + headers[filename],
                 "```markdown",
@@ -87,3 +93,23 @@ def get_repo_context(readme_md: str = "README.md", claude_md: str = "CLAUDE.md",
         return "\n".join(context_parts)
     else:
         return "No additional repository context available."
+
+
+def _top_level_entries() -> list[str]:
+    """
+    Lists the visible, non-ignored entries in the working directory, marking directories with a trailing slash.
+    """
+    with os.scandir(".") as entries:
+        names = (entry.name + "/" if entry.is_dir(follow_symlinks=False) else entry.name for entry in entries)
+        return sorted(name for name in names if not name.startswith(".") and not _should_ignore(name))
+
+
+def _truncate_doc(content: str) -> str:
+    """
+    Keeps the head and tail of docs over _MAX_DOC_CHARS, which typically hold the overview and reference sections.
+    """
+    if len(content) <= _MAX_DOC_CHARS:
+        return content
+    head = _MAX_DOC_CHARS - _DOC_TAIL_CHARS
+    omitted = len(content) - _MAX_DOC_CHARS
+    return f"{content[:head]}\n\n[... {omitted} characters omitted ...]\n\n{content[-_DOC_TAIL_CHARS:]}"
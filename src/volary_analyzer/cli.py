@@ -3,17 +3,13 @@
 import argparse
 import os
 import sys
+from collections.abc import Callable
 
 from platformdirs import user_config_dir
-from pydantic import ValidationError
 from rich.console import Console
 
-from .analyze import analyze
 from .completion_api import CompletionApi
-from .eval import eval
-from .output_schemas import EvaluatedTechDebtAnalysis, TechDebtAnalysis
-from .print_issues import print_issues
-from .tools import web_answers_tool_factory
+from .output_schemas import TechDebtAnalysis
 
 console = Console(stderr=True)
 
@@ -51,81 +47,123 @@ def main() -> int:
         "action",
         nargs="?",
         default="run",
-        choices=[
-            # An enum would be nice for this but it looks bad in the CLI
-            "run",
-            "analyze",
-            "eval",
-            "print",
-            "search",
-        ],
+        # An enum would be nice for this but it looks bad in the CLI
+        choices=list(_ACTIONS),
     )
     args = parser.parse_args()
-    if not args.completions_api_key:
-        sys.stderr.write("The flag --completions_api_key is required (or set the $COMPLETIONS_API_KEY env var)\n")
-        return 1
 
     if args.change_dir:
         os.chdir(args.change_dir)
 
-    api = CompletionApi(
+    return _ACTIONS[args.action](args)
+
+
+def _completion_api(args: argparse.Namespace) -> CompletionApi | None:
+    if not args.completions_api_key:
+        sys.stderr.write("The flag --completions_api_key is required (or set the $COMPLETIONS_API_KEY env var)\n")
+        return None
+    return CompletionApi(
         api_key=args.completions_api_key,
         endpoint=args.completions_endpoint,
     )
 
-    match args.action:
-        case "run":
-            console.print("[bold green]Running analysis...[/bold green]")
-            analysis = analyze(
-                api=api,
-                coordinator_model=args.coordinator_model,
-                delegate_model=args.delegate_model,
-            )
-            evaluated_analysis = eval(
-                api=api,
-                analysis=analysis,
-                coordinator_model=args.coordinator_model,
-                search_model=args.delegate_model,
-                cache_dir=args.cache_dir,
-            )
-            print_issues(evaluated_analysis)
-            api.print_usage_summary()
-        case "analyze":
-            console.print("[bold green]Running analysis...[/bold green]")
-            analysis = analyze(
-                api=api,
-                coordinator_model=args.coordinator_model,
-                delegate_model=args.delegate_model,
-            )
-            print(analysis.model_dump_json(indent=2))
-            api.print_usage_summary()
-        case "eval":
-            console.print("[bold green]Evaluating issues...[/bold green]")
-            analysis = TechDebtAnalysis.model_validate_json(sys.stdin.read())
-            evaluated_analysis = eval(
-                api=api,
-                analysis=analysis,
-                coordinator_model=args.coordinator_model,
-                cache_dir=args.cache_dir,
-                search_model=args.delegate_model,
-            )
-            print(evaluated_analysis.model_dump_json(indent=2))
-            api.print_usage_summary()
-        case "print":
-            raw = sys.stdin.read()
-            try:
-                analysis = EvaluatedTechDebtAnalysis.model_validate_json(raw)
-            except ValidationError:
-                analysis = TechDebtAnalysis.model_validate_json(raw)
-            print_issues(analysis)
-        case "search":
-            console.print("[bold green]Searching results...[/bold green]")
-            tool = web_answers_tool_factory(api=api, model=args.delegate_model)
-            question = sys.stdin.read().strip()
-            print(tool(question))
-            api.print_usage_summary()
+
+# The action implementations import what they need lazily, so e.g. printing doesn't pay to import the agents.
+
+
+def _run(args: argparse.Namespace) -> int:
+    from .analyze import analyze
+    from .eval import eval
+    from .print_issues import print_issues
+
+    api = _completion_api(args)
+    if not api:
+        return 1
+    console.print("[bold green]Running analysis...[/bold green]")
+    analysis = analyze(
+        api=api,
+        coordinator_model=args.coordinator_model,
+        delegate_model=args.delegate_model,
+    )
+    evaluated_analysis = eval(
+        api=api,
+        analysis=analysis,
+        coordinator_model=args.coordinator_model,
+        search_model=args.delegate_model,
+        cache_dir=args.cache_dir,
+    )
+    print_issues(evaluated_analysis)
+    api.print_usage_summary()
     return 0
 
 
+def _analyze(args: argparse.Namespace) -> int:
+    from .analyze import analyze
+
+    api = _completion_api(args)
+    if not api:
+        return 1
+    console.print("[bold green]Running analysis...[/bold green]")
+    analysis = analyze(
+        api=api,
+        coordinator_model=args.coordinator_model,
+        delegate_model=args.delegate_model,
+    )
+    print(analysis.model_dump_json(indent=2))
+    api.print_usage_summary()
+    return 0
+
+
+def _eval(args: argparse.Namespace) -> int:
+    from .eval import eval
+
+    api = _completion_api(args)
+    if not api:
+        return 1
+    console.print("[bold green]Evaluating issues...[/bold green]")
+    analysis = TechDebtAnalysis.model_validate_json(sys.stdin.buffer.read())
+    evaluated_analysis = eval(
+        api=api,
+        analysis=analysis,
+        coordinator_model=args.coordinator_model,
+        cache_dir=args.cache_dir,
+        search_model=args.delegate_model,
+    )
+    print(evaluated_analysis.model_dump_json(indent=2))
+    api.print_usage_summary()
+    return 0
+
+
+def _print(args: argparse.Namespace) -> int:
+    from .print_issues import parse_analysis, print_issues
+
+    # Pydantic parses bytes directly, so skip decoding to an intermediate str
+    print_issues(parse_analysis(sys.stdin.buffer.read()))
+    return 0
+
+
+def _search(args: argparse.Namespace) -> int:
+    from .tools import web_answers_tool_factory
+
+    api = _completion_api(args)
+    if not api:
+        return 1
+    console.print("[bold green]Searching results...[/bold green]")
+    tool = web_answers_tool_factory(api=api, model=args.delegate_model)
+    question = sys.stdin.read().strip()
+    print(tool(question))
+    api.print_usage_summary()
+    return 0
+
+
+_ACTIONS: dict[str, Callable[[argparse.Namespace], int]] = {
+    "run": _run,
+    "analyze": _analyze,
+    "eval": _eval,
+    "print": _print,
+    "search": _search,
+}
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,5 +1,10 @@
+import contextlib
 import inspect
 import json
+import random
+import threading
+import time
+import weakref
 from collections.abc import Callable
 from typing import (
     TypedDict,
@@ -75,15 +80,27 @@ class CompletionApi:
     agents, allowing shared usage statistics when delegating tasks.
     """
 
-    def __init__(self, api_key: str, endpoint: str):
+    def __init__(self, api_key: str, endpoint: str, max_concurrent_requests: int = 16):
         """
         Initialize the completion API client.
 
         :param api_key: API key for authentication
         :param endpoint: API endpoint URL
+        :param max_concurrent_requests: Maximum requests in flight at once across all agents sharing this client
         """
         self.api_key = api_key
         self.endpoint = endpoint
+        # Delegate agents fan out (and can fan out further themselves), so bound how hard we hit the provider at once.
+        self._request_slots = threading.BoundedSemaphore(max_concurrent_requests)
+        # Shared by every agent so requests reuse kept-alive connections rather than paying for a new TLS handshake
+        self._client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_concurrent_requests,
+                max_keepalive_connections=max_concurrent_requests,
+            ),
+        )
+        # Agents run tool calls (and therefore delegate agents) concurrently on threads, guard the stats below.
+        self._usage_lock = threading.Lock()
         # Track per-agent usage stats
         self._agent_stats: dict[str, dict] = {}
         # Track global totals
@@ -123,6 +140,8 @@ class CompletionApi:
             api_key=self.api_key,
             endpoint=self.endpoint,
             response_format=response_format,
+            client=self._client,
+            request_slots=self._request_slots,
         )
 
         # Track usage from this call
@@ -135,38 +154,39 @@ class CompletionApi:
         if not usage:
             return
 
-        # Update global totals
-        self.total_iterations += 1
-        self.total_prompt_tokens += usage.get("prompt_tokens", 0)
-        self.total_completion_tokens += usage.get("completion_tokens", 0)
-        self.total_tokens += usage.get("total_tokens", 0)
-        self.total_cost += usage.get("cost", 0.0)
-
-        # Track cached tokens if available
-        prompt_details = usage.get("prompt_tokens_details", {})
-        cached = prompt_details.get("cached_tokens", 0)
-        self.total_cached_tokens += cached
-
-        # Initialize agent stats if needed
-        if agent_name not in self._agent_stats:
-            self._agent_stats[agent_name] = {
-                "model": model,
-                "iterations": 0,
-                "total_prompt_tokens": 0,
-                "total_completion_tokens": 0,
-                "total_cached_tokens": 0,
-                "total_tokens": 0,
-                "total_cost": 0.0,
-            }
+        with self._usage_lock:
+            # Update global totals
+            self.total_iterations += 1
+            self.total_prompt_tokens += usage.get("prompt_tokens", 0)
+            self.total_completion_tokens += usage.get("completion_tokens", 0)
+            self.total_tokens += usage.get("total_tokens", 0)
+            self.total_cost += usage.get("cost", 0.0)
+
+            # Track cached tokens if available
+            prompt_details = usage.get("prompt_tokens_details", {})
+            cached = prompt_details.get("cached_tokens", 0)
+            self.total_cached_tokens += cached
+
+            # Initialize agent stats if needed
+            if agent_name not in self._agent_stats:
+                self._agent_stats[agent_name] = {
+                    "model": model,
+                    "iterations": 0,
+                    "total_prompt_tokens": 0,
+                    "total_completion_tokens": 0,
+                    "total_cached_tokens": 0,
+                    "total_tokens": 0,
+                    "total_cost": 0.0,
+                }
 
-        # Update agent-specific stats
-        agent = self._agent_stats[agent_name]
-        agent["iterations"] += 1
-        agent["total_prompt_tokens"] += usage.get("prompt_tokens", 0)
-        agent["total_completion_tokens"] += usage.get("completion_tokens", 0)
-        agent["total_tokens"] += usage.get("total_tokens", 0)
-        agent["total_cost"] += usage.get("cost", 0.0)
-        agent["total_cached_tokens"] += cached
+            # Update agent-specific stats
+            agent = self._agent_stats[agent_name]
+            agent["iterations"] += 1
+            agent["total_prompt_tokens"] += usage.get("prompt_tokens", 0)
+            agent["total_completion_tokens"] += usage.get("completion_tokens", 0)
+            agent["total_tokens"] += usage.get("total_tokens", 0)
+            agent["total_cost"] += usage.get("cost", 0.0)
+            agent["total_cached_tokens"] += cached
 
     def get_agent_stats(self, agent_name: str) -> dict:
         """Get usage stats for a specific agent."""
@@ -230,6 +250,8 @@ def complete(
     api_key: str,
     endpoint: str,
     response_format: dict = None,
+    client: httpx.Client | None = None,
+    request_slots: threading.Semaphore | None = None,
 ) -> CompletionResponse:
     """
     Calls the openai compatible completions API.
@@ -241,22 +263,18 @@ def complete(
     :param api_key: The API key for the endpoint
     :param endpoint: The endpoint to make a request to
     :param response_format: The structured format to respond with if the model supports it.
+    :param client: Optional HTTP client to make the request with, to reuse its connections.
+    :param request_slots: Optional semaphore to hold while a request is in flight, to bound concurrent requests.
     :return: The completion response json.
     """
 
-    tools_prompt = [tool_prompt(tool) for tool in tools]
+    tools_prompt = [_cached_tool_prompt(tool) for tool in tools]
 
     # Build request payload
     payload = {
         "model": model,
         "tools": tools_prompt,
-        "messages": [
-            {
-                "role": "system",
-                "content": system_prompt,
-            }
-        ]
-        + messages,
+        "messages": [_system_message(model, system_prompt)] + messages,
         "usage": {"include": True},
     }
 
@@ -264,23 +282,16 @@ def complete(
     if response_format:
         payload["response_format"] = response_format
 
-    try:
-        resp = httpx.post(
-            url=endpoint,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-            timeout=httpx.Timeout(60.0, connect=10.0),
-        )
-    except httpx.TimeoutException as e:
-        raise CompletionApiError(f"Request timed out after 60 seconds: {e}") from e
-    except httpx.RequestError as e:
-        raise CompletionApiError(f"Network error when calling CompletionApi API: {e}") from e
-
-    if resp.status_code != 200:
-        raise APIRequestError(resp.status_code, resp.text)
+    resp = _post_with_retries(
+        endpoint=endpoint,
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        },
+        payload=payload,
+        client=client,
+        request_slots=request_slots,
+    )
 
     try:
         return resp.json()
@@ -288,6 +299,97 @@ def complete(
         raise CompletionApiError(f"Failed to parse JSON response: {e}") from e
 
 
+# Rate limits and transient provider errors, which are worth retrying
+_RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+_MAX_ATTEMPTS = 5
+_INITIAL_RETRY_DELAY = 0.5
+_MAX_RETRY_DELAY = 30.0
+# Stop retrying once this long has passed, so that the worst case (this plus one last request) stays well under the
+# time an agent waits for its tool calls, which include delegate agents making these requests.
+_MAX_RETRY_TIME = 90.0
+
+
+def _post_with_retries(
+    endpoint: str,
+    headers: dict,
+    payload: dict,
+    client: httpx.Client | None,
+    request_slots: threading.Semaphore | None = None,
+) -> httpx.Response:
+    """
+    Posts the request, retrying transient failures with jittered exponential backoff.
+
+    The request slot is only held while a request is in flight, not while backing off, so that a rate limited request
+    doesn't hold up other agents.
+    """
+    post = client.post if client else httpx.post
+    slot = request_slots or contextlib.nullcontext()
+    deadline = time.monotonic() + _MAX_RETRY_TIME
+    for attempt in range(_MAX_ATTEMPTS):
+        retry_after = None
+        try:
+            with slot:
+                resp = post(
+                    url=endpoint,
+                    headers=headers,
+                    json=payload,
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                )
+        except httpx.ReadTimeout as e:
+            # Not retried: the provider is likely still generating (and billing for) the response, and waiting out
+            # another full timeout would leave the agent waiting on us to give up.
+            raise CompletionApiError(f"Request timed out after 60 seconds: {e}") from e
+        except httpx.TimeoutException as e:
+            cause, error = e, CompletionApiError(f"Request timed out: {e}")
+        except httpx.RequestError as e:
+            cause, error = e, CompletionApiError(f"Network error when calling CompletionApi API: {e}")
+        else:
+            if resp.status_code == 200:
+                return resp
+            cause, error = None, APIRequestError(resp.status_code, resp.text)
+            if resp.status_code not in _RETRYABLE_STATUS_CODES:
+                raise error
+            retry_after = resp.headers.get("Retry-After")
+
+        delay = _retry_delay(attempt, retry_after)
+        if attempt == _MAX_ATTEMPTS - 1 or time.monotonic() + delay > deadline:
+            raise error from cause
+        console.print(f"[dim yellow]Completion request failed, retrying in {delay:.1f}s...[/dim yellow]")
+        time.sleep(delay)
+
+    raise AssertionError("unreachable")
+
+
+def _retry_delay(attempt: int, retry_after: str | None) -> float:
+    """
+    How long to wait before the next attempt. Honours the server's Retry-After (in seconds) if given, otherwise uses
+    "full jitter" so concurrent agents that were rate limited together don't all retry at the same moment.
+    """
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), _MAX_RETRY_DELAY)
+        except ValueError:
+            pass  # HTTP-date form, fall back to our own backoff
+    return random.uniform(0, min(_MAX_RETRY_DELAY, _INITIAL_RETRY_DELAY * 2**attempt))
+
+
+# Models that only cache prompts when explicitly told where the cacheable prefix ends. Others (e.g. OpenAI, Gemini)
+# cache matching prefixes automatically.
+_EXPLICIT_CACHE_MODEL_PREFIXES = ("anthropic/",)
+
+
+def _system_message(model: str, system_prompt: str) -> dict:
+    """
+    Builds the system message, marking it as cacheable for providers that need to be told.
+    """
+    if model.startswith(_EXPLICIT_CACHE_MODEL_PREFIXES):
+        return {
+            "role": "system",
+            "content": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        }
+    return {"role": "system", "content": system_prompt}
+
+
 def tool_prompt(tool: Callable) -> dict:
     """
     Converts a Python function into OpenAI tool schema format.
@@ -301,6 +403,8 @@ def tool_prompt(tool: Callable) -> dict:
     if docstring.long_description:
         description += "\n\n" + docstring.long_description
 
+    param_descriptions = {param.arg_name: param.description or "" for param in docstring.params}
+
     # Get function signature and type hints
     sig = inspect.signature(tool)
     type_hints = get_type_hints(tool)
@@ -318,15 +422,8 @@ def tool_prompt(tool: Callable) -> dict:
         param_type = type_hints.get(param_name, str)
         json_type, items = _python_type_to_json_schema(param_type)
 
-        # Find parameter description from docstring
-        param_desc = ""
-        for doc_param in docstring.params:
-            if doc_param.arg_name == param_name:
-                param_desc = doc_param.description or ""
-                break
-
         # Build property definition
-        prop = {"type": json_type, "description": param_desc}
+        prop = {"type": json_type, "description": param_descriptions.get(param_name, "")}
 
         if items:
             prop["items"] = items
@@ -347,6 +444,21 @@ def tool_prompt(tool: Callable) -> dict:
     }
 
 
+# Keyed on the underlying function so every agent's bound set_todos method shares one entry
+_tool_prompt_cache: weakref.WeakKeyDictionary[Callable, dict] = weakref.WeakKeyDictionary()
+
+
+def _cached_tool_prompt(tool: Callable) -> dict:
+    """
+    Returns the tool schema for tool, only building it the first time the tool is seen.
+    """
+    key = getattr(tool, "__func__", tool)
+    prompt = _tool_prompt_cache.get(key)
+    if prompt is None:
+        prompt = _tool_prompt_cache[key] = tool_prompt(tool)
+    return prompt
+
+
 class InvalidToolArgOriginTypeError(Exception):
     """Raised when a tool argument has an unsupported origin type."""
 
@@ -3,8 +3,8 @@ Evaluation agent - scores technical debt issues for relevance and actionability.
 """
 
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
-import chromadb
 from rich.console import Console
 
 from .agent import Agent
@@ -22,10 +22,13 @@ from .output_schemas import (
 )
 from .prompts import EVAL_PROMPT, EVAL_SYSTEM_PROMPT
 from .tools import query_issues_factory, read_file, web_answers_tool_factory
-from .vectorised_issue_search import github_vector_db
 
 console = Console(stderr=True)  # Output to stderr so stdout is clean for piping
 
+_IMPACT_SCORES = {"high": 3, "medium": 2, "low": 1}
+_EFFORT_SCORES = {"low": 3, "medium": 2, "high": 1}  # Inverted
+_BOOL_CRITERIA = tuple(name for name, field in EvaluationCriteria.model_fields.items() if field.annotation is bool)
+
 
 def contextualise_issue(issue: TechDebtIssue) -> IssueWithContext:
     file_contents = {}
@@ -77,6 +80,14 @@ def eval(
     ]
     github_issue_instruction = ""
     if repo_path := get_github_repo():
+        # These are slow to import and only needed when we can search the repo's issues.
+        import chromadb
+        from chromadb.api.client import SharedSystemClient
+
+        from .vectorised_issue_search import github_vector_db
+
+        # Chroma keeps a process-wide client per path which can hold stale segments; make sure we load what's on disk.
+        SharedSystemClient.clear_system_cache()
         chroma_client = chromadb.PersistentClient(path=cache_dir)
         gh_client = get_github_client()
         collection = github_vector_db(chroma_client, gh_client, repo_path)
@@ -85,9 +96,9 @@ def eval(
     else:
         console.print("I notice this isn't a GitHub repo. We have no access to your issues so may report duplicates.")
 
-    issues_with_context = []
-    for issue in analysis.issues:
-        issues_with_context.append(contextualise_issue(issue))
+    # Each issue shells out to git blame for its files, so gather them concurrently.
+    with ThreadPoolExecutor(max_workers=min(len(analysis.issues), 10)) as executor:
+        issues_with_context = list(executor.map(contextualise_issue, analysis.issues))
 
     evaluation_input = EvaluationInput(issues=issues_with_context)
 
@@ -101,7 +112,7 @@ def eval(
 
     console.print("[bold]Running evaluation...[/bold]", style="cyan")
     evaluations = eval_agent.run(
-        prompt=EVAL_PROMPT % evaluation_input.model_dump_json(indent=2),
+        prompt=EVAL_PROMPT % evaluation_input.model_dump_json(),
         output_class=Evaluation,
     )
 
@@ -154,11 +165,8 @@ def _calculate_priority_score(issue: EvaluatedTechDebtIssue) -> float:
     - High impact + High effort = 3 * 1 = 3
     - Low impact + High effort = 1 * 1 = 1 (lowest priority)
     """
-    impact_scores = {"high": 3, "medium": 2, "low": 1}
-    effort_scores = {"low": 3, "medium": 2, "high": 1}  # Inverted
-
-    impact = impact_scores.get(issue.evaluation.impact_score, 1)
-    effort = effort_scores.get(issue.evaluation.effort, 1)
+    impact = _IMPACT_SCORES.get(issue.evaluation.impact_score, 1)
+    effort = _EFFORT_SCORES.get(issue.evaluation.effort, 1)
 
     return impact * effort
 
@@ -167,7 +175,6 @@ def _order_issues(issue: EvaluatedTechDebtIssue):
     """Sort key function to order issues once they are evaluated."""
     # Primary: priority score (negative for descending)
     # Secondary: bool counts (objective, actionable, production)
-    eval_data = issue.evaluation.model_dump()
-    bool_score = sum(1 for k, v in eval_data.items() if isinstance(v, bool) and v)
+    bool_score = sum(getattr(issue.evaluation, name) for name in _BOOL_CRITERIA)
 
     return (-_calculate_priority_score(issue), -bool_score)
@@ -1,23 +1,42 @@
+import configparser
+import functools
 import os
 import shutil
 import subprocess
+from typing import TYPE_CHECKING
 
-from github import Auth, Github
+if TYPE_CHECKING:
+    from github import Github
 
 
-def get_github_repo() -> str | None:
-    """Extract GitHub owner and repo name from git remote."""
+def _read_origin_url() -> str | None:
+    """
+    Read the origin remote's URL straight from .git/config, which saves spawning git to look it up.
+
+    Returns None if it can't be found this way (e.g. in a worktree, where .git is a file), in which case the caller
+    should ask git. This doesn't apply rewrites from outside the repo's own config.
+    """
+    path = os.path.abspath(os.getcwd())
+    while not os.path.exists(os.path.join(path, ".git")):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+    config = configparser.ConfigParser(strict=False, interpolation=None)
     try:
-        remote_url = subprocess.check_output(
-            ["git", "remote", "get-url", "origin"],
-            text=True,
-            stderr=subprocess.DEVNULL,
-        ).strip()
-    except subprocess.CalledProcessError:
+        config.read(os.path.join(path, ".git", "config"))
+    except configparser.Error:
         return None
-    except FileNotFoundError:
+    url = config.get('remote "origin"', "url", fallback=None)
+    # git rewrites URLs matching insteadOf rules, leave those to it
+    if url is None or any(section.startswith("url ") for section in config.sections()):
         return None
+    return url
+
 
+def _parse_github_repo(remote_url: str) -> str | None:
+    """Extract the owner/repo path from a GitHub remote URL, or None if it isn't one."""
     if remote_url.startswith("git@github.com:"):
         repo_path = remote_url.removeprefix("git@github.com:")
     elif "github.com" in remote_url:
@@ -29,6 +48,26 @@ def get_github_repo() -> str | None:
     return repo_path.removesuffix(".git")
 
 
+def get_github_repo() -> str | None:
+    """Extract GitHub owner and repo name from git remote."""
+    # The URL in .git/config can still be rewritten by insteadOf rules in the global or system config, or come from an
+    # included file, so only trust it if it's recognisably GitHub and ask git otherwise.
+    if (remote_url := _read_origin_url()) and (repo_path := _parse_github_repo(remote_url)):
+        return repo_path
+    try:
+        remote_url = subprocess.check_output(
+            ["git", "remote", "get-url", "origin"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except subprocess.CalledProcessError:
+        return None
+    except FileNotFoundError:
+        return None
+    return _parse_github_repo(remote_url)
+
+
+@functools.cache
 def github_auth() -> str:
     """
     Get GitHub authentication token from environment or gh CLI.
@@ -49,8 +88,11 @@ def github_auth() -> str:
     return token
 
 
-def get_github_client() -> Github:
+@functools.cache
+def get_github_client() -> "Github":
     """
-    Create an authenticated PyGithub client.
+    Create an authenticated PyGithub client. This is shared for the whole run so it reuses the same connection pool.
     """
+    from github import Auth, Github
+
     return Github(auth=Auth.Token(github_auth()), per_page=100, retry=3)
@@ -3,13 +3,20 @@ import json
 import re
 import sys
 import urllib.parse
-from collections.abc import Iterable
-from typing import Any
+from collections.abc import Callable, Container, Iterable
+from typing import Annotated, Any, get_args
 
+from pydantic import Field, TypeAdapter
 from rich.console import Console
 from rich.table import Table
 
-from .output_schemas import EvaluatedTechDebtAnalysis, FileReference, TechDebtAnalysis, TechDebtIssue
+from .output_schemas import (
+    EvaluatedTechDebtAnalysis,
+    EvaluationCriteria,
+    FileReference,
+    TechDebtAnalysis,
+    TechDebtIssue,
+)
 
 console = Console(stderr=True)
 
@@ -21,9 +28,10 @@ _file_search_re = re.compile(
 )
 
 
-def _format_eval_key(key: str) -> str:
-    # "impact_score" -> "Impact Score"
-    return key.replace("_", " ").title()
+# "impact_score" -> "Impact Score"
+_EVAL_KEY_LABELS = {key: key.replace("_", " ").title() for key in EvaluationCriteria.model_fields}
+
+_SCORE_KEYS = frozenset({"impact_score", "effort"})
 
 
 _COLOUR_BY_SCORE = {
@@ -44,7 +52,7 @@ def _format_eval_value(key: str, value: Any) -> str:
     if isinstance(value, bool):
         return "[green]Yes[/green]" if value else "[red]No[/red]"
 
-    if key == "impact_score" or key == "effort":
+    if key in _SCORE_KEYS:
         score = str(value).lower()
         colours = _COLOUR_BY_SCORE if key == "impact_score" else _COLOUR_BY_EFFORT
         colour = colours.get(score, "white")
@@ -54,6 +62,34 @@ def _format_eval_value(key: str, value: Any) -> str:
     return str(value)
 
 
+def _render_eval_lines(format_value: Callable[[str, Any], str]) -> dict[tuple[str, Any], str]:
+    """
+    Renders each line of an evaluation column, keyed by (field, value).
+
+    Every evaluation field is either a bool or a Literal of scores, so this can be done once up front rather than for
+    every issue.
+    """
+    return {
+        (key, value): f"{label}: {format_value(key, value)}"
+        for key, label in _EVAL_KEY_LABELS.items()
+        for value in get_args(EvaluationCriteria.model_fields[key].annotation) or (True, False)
+    }
+
+
+_EVAL_LINES = _render_eval_lines(_format_eval_value)
+
+
+# Evaluated analyses have to be tried first, since a plain one would accept them and silently drop the evaluations.
+_ANALYSIS_ADAPTER = TypeAdapter(
+    Annotated[EvaluatedTechDebtAnalysis | TechDebtAnalysis, Field(union_mode="left_to_right")]
+)
+
+
+def parse_analysis(raw: bytes | str) -> TechDebtAnalysis | EvaluatedTechDebtAnalysis:
+    """Parses either kind of analysis from JSON, decoding the JSON only once."""
+    return _ANALYSIS_ADAPTER.validate_json(raw)
+
+
 def print_issues(analysis: TechDebtAnalysis | EvaluatedTechDebtAnalysis, *, width: int | None = None) -> None:
     """Print tech debt issues in a formatted table.
 
@@ -82,8 +118,7 @@ def print_issues(analysis: TechDebtAnalysis | EvaluatedTechDebtAnalysis, *, widt
 
         if has_evaluation:
             # Format evaluation criteria
-            eval_data = issue.evaluation.model_dump()
-            eval_display = "\n".join(f"{_format_eval_key(k)}: {_format_eval_value(k, v)}" for k, v in eval_data.items())
+            eval_display = "\n".join(_EVAL_LINES[k, getattr(issue.evaluation, k)] for k in _EVAL_KEY_LABELS)
             if issue.duplicated_by:
                 duplicated_by_display = "\n".join(issue.duplicated_by)
                 eval_display += f"\nDuplicates: [red]{duplicated_by_display}[/red]"
@@ -117,7 +152,7 @@ def render_summary_markdown(
     analysis: TechDebtAnalysis | EvaluatedTechDebtAnalysis,
     repo: str = "",
     revision: str = "",
-    files: set = frozenset(),
+    files: Container[str] = frozenset(),
 ) -> str:
     """Renders a Markdown table (GitHub flavour) containing the given analysis issues.
 
@@ -144,7 +179,7 @@ def render_summary_markdown(
 
 
 def _render_summary_markdown_row(
-    issue: TechDebtIssue, repo: str = "", revision: str = "", files: set = frozenset()
+    issue: TechDebtIssue, repo: str = "", revision: str = "", files: Container[str] = frozenset()
 ) -> Iterable[str]:
     yield _escape(issue.title)
     yield _escape(_add_source_links(issue.short_description, repo, revision, files))
@@ -152,8 +187,7 @@ def _render_summary_markdown_row(
 
     if evaluation := getattr(issue, "evaluation", None):
         # Format evaluation criteria
-        eval_data = evaluation.model_dump()
-        eval_display = "\n".join(f"{_format_eval_key(k)}: {_format_eval_value(k, v)}" for k, v in eval_data.items())
+        eval_display = "\n".join(_EVAL_LINES_MARKDOWN[k, getattr(evaluation, k)] for k in _EVAL_KEY_LABELS)
         yield _escape(eval_display)
 
     files_display = (
@@ -167,7 +201,7 @@ def _escape(str: str) -> str:
     return str.replace("\n", "<br>").replace("|", "\\|")
 
 
-def _add_source_links(text: str, repo: str = "", revision: str = "", files: set = frozenset()) -> str:
+def _add_source_links(text: str, repo: str = "", revision: str = "", files: Container[str] = frozenset()) -> str:
     """Add Markdown links to source files found in the given text."""
     return _file_search_re.sub(
         lambda m: _markdown_link(
@@ -184,7 +218,9 @@ def _add_source_links(text: str, repo: str = "", revision: str = "", files: set
     )
 
 
-def _file_source_link(ref: FileReference, repo: str = "", revision: str = "", files: set = frozenset()) -> str:
+def _file_source_link(
+    ref: FileReference, repo: str = "", revision: str = "", files: Container[str] = frozenset()
+) -> str:
     """Render a Markdown link from one of our file objects."""
     return (
         _markdown_link(
@@ -232,36 +268,24 @@ def _markdown_link(filename: str, start: str | None, end: str | None, repo: str,
     return f"[{text}](https://github.com/{repo}/blob/{revision}/{filename}{query})"
 
 
-def _format_eval_key(key: str) -> str:
-    # "impact_score" -> "Impact Score"
-    return key.replace("_", " ").title()
-
-
-def _format_eval_value(key: str, value) -> str:
+def _format_eval_value_markdown(key: str, value) -> str:
     # Booleans: Yes/No
     if isinstance(value, bool):
         return "Yes" if value else "No"
 
-    if key == "impact_score" or key == "effort":
-        score = str(value).lower()
-        return score.title()
+    if key in _SCORE_KEYS:
+        return str(value).lower().title()
 
     # Fallback for anything else
     return str(value)
 
 
-if __name__ == "__main__":
-    try:
-        stdin_content = sys.stdin.read()
+_EVAL_LINES_MARKDOWN = _render_eval_lines(_format_eval_value_markdown)
 
-        # Try to parse as EvaluatedTechDebtAnalysis first
-        try:
-            analysis = EvaluatedTechDebtAnalysis.model_validate_json(stdin_content)
-        except Exception:
-            # Fall back to TechDebtAnalysis
-            analysis = TechDebtAnalysis.model_validate_json(stdin_content)
 
-        print_issues(analysis)
+if __name__ == "__main__":
+    try:
+        print_issues(parse_analysis(sys.stdin.buffer.read()))
     except json.JSONDecodeError as e:
         console.print(f"[red]Error parsing JSON: {e}[/red]")
         sys.exit(1)
@@ -63,10 +63,10 @@ You should avoid issues that can't be actioned now:
 """
 
 ANALYSIS_DELEGATE_PROMPT = """
+{status}
+
 You have been delegated the following task in helping identifying key areas of technical debt in this repository:
 {task}
-
-{status}
 """
 
 ANALYZER_PROMPT = """
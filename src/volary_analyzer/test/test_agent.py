@@ -1,9 +1,12 @@
 import json
+import time
 
 from ..agent import (
+    _ELIDED_TOOL_RESULT,
     Agent,
     CompletionApi,
     ToolCall,
+    ToolCallResult,
     ToolFunction,
 )
 from ..completion_api import tool_prompt
@@ -101,6 +104,27 @@ class TestToolCalling:
         assert result.message["tool_call_id"] == "call_error"
         assert "Something went wrong" in result.message["content"]
 
+    def test_call_tool_truncates_long_results(self) -> None:
+        """Test that tool results over the limit are truncated with a note saying so."""
+
+        def long_tool() -> str:
+            return "x" * 150
+
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        agent = Agent(
+            instruction="Test agent",
+            tools=[long_tool],
+            model="test-model",
+            api=api,
+            max_tool_result_chars=100,
+        )
+        tool_call = ToolCall(id="call_long", function=ToolFunction(name="long_tool", arguments="{}"), type="function")
+
+        result = agent._call_tool(long_tool, tool_call)
+
+        assert result.message["content"].startswith("x" * 100 + "\n")
+        assert "truncated 50 characters" in result.message["content"]
+
     def test_call_tools_updates_messages(self) -> None:
         """Test that _call_tools properly updates the messages list."""
 
@@ -146,6 +170,34 @@ class TestToolCalling:
         assert agent.messages[1]["tool_call_id"] == "call_b"
         assert "B: 42" in agent.messages[1]["content"]
 
+    def test_call_tools_keeps_call_order(self) -> None:
+        """Test that tool results are added in the order the calls were made, not sorted by call ID."""
+
+        def slow_tool() -> str:
+            time.sleep(0.05)
+            return "slow"
+
+        def fast_tool() -> str:
+            return "fast"
+
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        agent = Agent(
+            instruction="Test agent",
+            tools=[slow_tool, fast_tool],
+            model="test-model",
+            api=api,
+        )
+
+        agent._call_tools(
+            [
+                {"id": "call_z", "type": "function", "function": {"name": "slow_tool", "arguments": "{}"}},
+                {"id": "call_y", "type": "function", "function": {"name": "missing_tool", "arguments": "{}"}},
+                {"id": "call_x", "type": "function", "function": {"name": "fast_tool", "arguments": "{}"}},
+            ]
+        )
+
+        assert [m["tool_call_id"] for m in agent.messages] == ["call_z", "call_y", "call_x"]
+
     def test_call_tools_filters_pseudo_tools(self) -> None:
         """Test that _call_tools doesn't execute pseudo-tools as regular tools."""
 
@@ -204,6 +256,150 @@ class TestToolCalling:
 
         assert len(agent.messages) == 0
 
+    def test_tool_executor_reused_until_run_finishes(self, monkeypatch) -> None:
+        """Test that tool calls share one pool across turns, and that it's shut down when the run ends."""
+
+        def real_tool() -> str:
+            return "real result"
+
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        agent = Agent(
+            instruction="Test agent",
+            tools=[real_tool],
+            model="test-model",
+            api=api,
+        )
+        tool_call_raw = {"id": "call_real", "type": "function", "function": {"name": "real_tool", "arguments": "{}"}}
+
+        agent._call_tools([tool_call_raw])
+        executor = agent._executor
+        agent._call_tools([tool_call_raw])
+        assert agent._executor is executor
+
+        stop = {"choices": [{"finish_reason": "stop", "message": {"role": "assistant", "content": "done"}}]}
+        monkeypatch.setattr(api, "complete", lambda **kwargs: stop)
+        assert agent.run("task") == "done"
+        assert agent._executor is None
+
+    def test_arguments_parsed_once(self) -> None:
+        """Test that tool call arguments are parsed when the call is constructed, not on each access."""
+        tool_call = ToolCall.from_dict(
+            {"id": "call_1", "type": "function", "function": {"name": "tool", "arguments": '{"value": "hello"}'}}
+        )
+        assert tool_call.function.parsed_arguments == {"value": "hello"}
+        assert tool_call.function.arguments == '{"value": "hello"}'
+
+        result = ToolCallResult(call=tool_call)
+        assert result.tool_args is tool_call.function.parsed_arguments
+
+    def test_reminder_not_accumulated(self, monkeypatch) -> None:
+        """Test that each request ends with a single TODO reminder, and reminders aren't kept in the history."""
+
+        def real_tool() -> str:
+            return "real result"
+
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        agent = Agent(
+            instruction="Test agent",
+            tools=[real_tool],
+            model="test-model",
+            api=api,
+        )
+        responses = [
+            {
+                "choices": [
+                    {
+                        "finish_reason": "tool_calls",
+                        "message": {
+                            "role": "assistant",
+                            "tool_calls": [
+                                {
+                                    "id": "call_real",
+                                    "type": "function",
+                                    "function": {"name": "real_tool", "arguments": "{}"},
+                                }
+                            ],
+                        },
+                    }
+                ]
+            },
+            {"choices": [{"finish_reason": "stop", "message": {"role": "assistant", "content": "done"}}]},
+        ]
+        sent_messages = []
+
+        def complete(messages, **kwargs):
+            sent_messages.append(messages)
+            return responses[len(sent_messages) - 1]
+
+        monkeypatch.setattr(api, "complete", complete)
+        assert agent.run("task", prompt="go") == "done"
+
+        for messages in sent_messages:
+            reminders = [m for m in messages if m.get("content") == agent._reminder]
+            assert len(reminders) == 1
+            assert messages[-1] is reminders[0]
+            assert messages[-1]["role"] == "user"
+        assert all(m.get("content") != agent._reminder for m in agent.messages)
+
+    def test_elide_old_tool_results(self) -> None:
+        """Test that the oldest tool results are elided once the history is too large, keeping the latest turn."""
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        agent = Agent(
+            instruction="Test agent",
+            tools=[],
+            model="test-model",
+            api=api,
+            max_context_chars=1000,
+        )
+        agent.messages = [
+            {"role": "user", "content": "go"},
+            {"role": "assistant", "content": None, "tool_calls": []},
+            {"role": "tool", "tool_call_id": "call_1", "content": "a" * 800},
+            {"role": "tool", "tool_call_id": "call_2", "content": "b" * 100},
+            {"role": "assistant", "content": None, "tool_calls": []},
+            {"role": "tool", "tool_call_id": "call_3", "content": "c" * 100},
+        ]
+
+        agent._elide_old_tool_results()
+
+        assert agent.messages[2]["content"] == _ELIDED_TOOL_RESULT
+        assert agent.messages[2]["tool_call_id"] == "call_1"
+        assert agent.messages[3]["content"] == "b" * 100
+        assert agent.messages[5]["content"] == "c" * 100
+
+    def test_elide_old_tool_results_under_budget(self) -> None:
+        """Test that nothing is elided while the history fits the budget."""
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        agent = Agent(
+            instruction="Test agent",
+            tools=[],
+            model="test-model",
+            api=api,
+        )
+        agent.messages = [
+            {"role": "assistant", "content": None, "tool_calls": []},
+            {"role": "tool", "tool_call_id": "call_1", "content": "a" * 400},
+            {"role": "assistant", "content": None, "tool_calls": []},
+        ]
+
+        agent._elide_old_tool_results()
+
+        assert agent.messages[1]["content"] == "a" * 400
+
+    def test_set_todos_updates_reminder(self) -> None:
+        """Test that the TODO reminder is re-rendered when the TODO list is replaced."""
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        agent = Agent(
+            instruction="Test agent",
+            tools=[],
+            model="test-model",
+            api=api,
+        )
+        assert agent._reminder == "Reminder: you currently have no items in your TODO list"
+
+        agent.set_todos([{"content": "Read code", "status": "completed"}, {"content": "Report", "status": "pending"}])
+        assert agent._reminder == "Reminder: You are currently doing the following:\n[✓] Read code\n[ ] Report"
+
     def test_integer_parameter_handling(self) -> None:
         """Test that tools with integer parameters work correctly end-to-end."""
 
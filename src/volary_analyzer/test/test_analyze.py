@@ -1,4 +1,7 @@
-from ..analyze import get_repo_context
+import os
+from pathlib import Path
+
+from ..analyze import _DOC_TAIL_CHARS, _MAX_DOC_CHARS, get_repo_context
 
 
 class TestGetRepoContext:
@@ -13,3 +16,31 @@ class TestGetRepoContext:
         assert "README.md was read correctly" in context
         assert "CLAUDE.md was read correctly" in context
         assert "AGENTS.md was read correctly" in context
+
+    def test_top_level_listing(self, tmp_path: Path) -> None:
+        """Test that the top-level listing has one entry per line, marks directories and skips hidden entries."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "main.py").write_text("test")
+        (tmp_path / ".env").write_text("test")
+        (tmp_path / "node_modules").mkdir()
+
+        original_dir = os.getcwd()
+        try:
+            os.chdir(tmp_path)
+            context = get_repo_context()
+        finally:
+            os.chdir(original_dir)
+
+        assert "```\nmain.py\nsrc/\n```" in context
+
+    def test_long_docs_truncated(self, tmp_path: Path) -> None:
+        """Test that long docs keep their head and tail, and note how much was left out."""
+        readme = tmp_path / "README.md"
+        readme.write_text("start" + "x" * _MAX_DOC_CHARS + "end")
+
+        context = get_repo_context(readme_md=str(readme))
+
+        assert "start" in context
+        assert "end" in context
+        assert "[... 8 characters omitted ...]" in context
+        assert "x" * (_MAX_DOC_CHARS - _DOC_TAIL_CHARS) not in context
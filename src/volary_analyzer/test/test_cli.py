@@ -0,0 +1,18 @@
+"""Tests for cli.py."""
+
+import subprocess
+import sys
+
+
+class TestImports:
+    def test_cli_does_not_import_chromadb(self):
+        """Test that heavy optional dependencies are only imported when they're used."""
+        code = "import sys, volary_analyzer.cli; print('chromadb' in sys.modules, 'github' in sys.modules)"
+        output = subprocess.check_output([sys.executable, "-c", code], text=True, cwd="src")
+        assert output.strip() == "False False"
+
+    def test_cli_does_not_import_agents(self):
+        """Test that the agents are only imported by the actions that run them."""
+        code = "import sys, volary_analyzer.cli; print('volary_analyzer.agent' in sys.modules)"
+        output = subprocess.check_output([sys.executable, "-c", code], text=True, cwd="src")
+        assert output.strip() == "False"
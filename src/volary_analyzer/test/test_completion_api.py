@@ -1,8 +1,26 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from .. import completion_api
 from ..agent import (
     TODO,
 )
 from ..completion_api import (
+    _MAX_ATTEMPTS,
+    _MAX_RETRY_DELAY,
+    _MAX_RETRY_TIME,
+    APIRequestError,
+    CompletionApi,
+    CompletionApiError,
+    _cached_tool_prompt,
     _python_type_to_json_schema,
+    _retry_delay,
+    _system_message,
+    complete,
     tool_prompt,
 )
 
@@ -102,6 +120,24 @@ class TestToolPrompt:
         assert params["properties"] == {}
         assert params["required"] == []
 
+    def test_cached_tool_prompt(self, monkeypatch) -> None:
+        """Test that a tool's schema is only built once, and shared between bound methods of the same function."""
+
+        class Holder:
+            def method_tool(self, value: str) -> str:
+                """A method tool."""
+                return value
+
+        built = []
+        monkeypatch.setattr(completion_api, "tool_prompt", lambda tool: built.append(tool) or tool_prompt(tool))
+
+        first = _cached_tool_prompt(Holder().method_tool)
+        second = _cached_tool_prompt(Holder().method_tool)
+
+        assert first is second
+        assert len(built) == 1
+        assert list(first["function"]["parameters"]["properties"]) == ["value"]
+
 
 class TestPythonTypeToJsonSchema:
     """Tests for the _python_type_to_json_schema function."""
@@ -159,3 +195,177 @@ class TestPythonTypeToJsonSchema:
         json_type, items = _python_type_to_json_schema(bool | None)
         assert json_type == "boolean"
         assert items is None
+
+
+class TestUsageTracking:
+    """Tests for CompletionApi usage tracking."""
+
+    def test_record_usage_concurrently(self) -> None:
+        """Test that usage recorded from many threads at once is totalled correctly."""
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        usage = {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for i in range(200):
+                executor.submit(api._record_usage, f"agent-{i % 4}", "test-model", usage)
+
+        assert api.total_iterations == 200
+        assert api.total_tokens == 1000
+        assert sum(api.get_agent_stats(f"agent-{i}")["iterations"] for i in range(4)) == 200
+
+
+class TestSystemMessage:
+    """Tests for building the system message."""
+
+    def test_plain_for_automatic_caching_models(self) -> None:
+        """Test that models with automatic prefix caching get a plain string system prompt."""
+        assert _system_message("openai/gpt-5.1", "prompt") == {"role": "system", "content": "prompt"}
+
+    def test_cache_control_for_anthropic(self) -> None:
+        """Test that Anthropic models get an explicit cache breakpoint on the system prompt."""
+        message = _system_message("anthropic/claude-sonnet-4.5", "prompt")
+        assert message["content"] == [{"type": "text", "text": "prompt", "cache_control": {"type": "ephemeral"}}]
+
+
+class TestConcurrencyLimit:
+    """Tests for limiting concurrent requests."""
+
+    def test_limits_requests_in_flight(self, monkeypatch) -> None:
+        """Test that no more than max_concurrent_requests are made at once."""
+        api = CompletionApi(api_key="test-key", endpoint="http://test", max_concurrent_requests=2)
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def fake_post(**kwargs) -> httpx.Response:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return httpx.Response(200, json={"choices": [], "usage": {}})
+
+        monkeypatch.setattr(api._client, "post", fake_post)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(16):
+                executor.submit(api.complete, "agent", "model", "prompt", [], [])
+
+        assert max_in_flight == 2
+
+    def test_slot_released_while_backing_off(self, monkeypatch) -> None:
+        """Test that a request waiting to retry doesn't hold up other requests."""
+        api = CompletionApi(api_key="test-key", endpoint="http://test", max_concurrent_requests=1)
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "1"}, text="slow down"),
+            httpx.Response(200, json={"choices": [], "usage": {}}),
+        ]
+        monkeypatch.setattr(api._client, "post", lambda **kwargs: responses.pop(0))
+        slot_free_while_sleeping = []
+
+        def fake_sleep(delay: float) -> None:
+            slot_free_while_sleeping.append(api._request_slots.acquire(blocking=False))
+            api._request_slots.release()
+
+        monkeypatch.setattr("time.sleep", fake_sleep)
+        api.complete("agent", "model", "prompt", [], [])
+
+        assert slot_free_while_sleeping == [True]
+
+
+class TestConnectionReuse:
+    """Tests for reusing HTTP connections."""
+
+    def test_requests_use_shared_client(self, monkeypatch) -> None:
+        """Test that every request from a CompletionApi goes through its long-lived client."""
+        api = CompletionApi(api_key="test-key", endpoint="http://test")
+        calls = []
+
+        def fake_post(**kwargs) -> httpx.Response:
+            calls.append(kwargs["url"])
+            return httpx.Response(200, json={"choices": [], "usage": {}})
+
+        monkeypatch.setattr(api._client, "post", fake_post)
+        api.complete("agent", "model", "prompt", [], [])
+        api.complete("agent", "model", "prompt", [], [])
+
+        assert calls == ["http://test", "http://test"]
+
+
+class TestRetries:
+    """Tests for retrying failed completion requests."""
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch) -> list[float]:
+        sleeps = []
+        monkeypatch.setattr("time.sleep", sleeps.append)
+        return sleeps
+
+    def _complete(self) -> dict:
+        return complete(
+            model="test-model",
+            system_prompt="test",
+            tools=[],
+            messages=[],
+            api_key="test-key",
+            endpoint="http://test",
+        )
+
+    def test_retries_rate_limit(self, monkeypatch, sleeps: list[float]) -> None:
+        """Test that a rate limited request is retried, honouring Retry-After."""
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "2"}, text="slow down"),
+            httpx.Response(200, json={"id": "ok", "choices": []}),
+        ]
+        monkeypatch.setattr(httpx, "post", lambda **kwargs: responses.pop(0))
+
+        assert self._complete()["id"] == "ok"
+        assert sleeps == [2.0]
+
+    def test_does_not_retry_client_errors(self, monkeypatch, sleeps: list[float]) -> None:
+        """Test that errors that won't succeed on retry fail immediately."""
+        monkeypatch.setattr(httpx, "post", lambda **kwargs: httpx.Response(401, text="bad key"))
+
+        with pytest.raises(APIRequestError) as e:
+            self._complete()
+        assert e.value.status_code == 401
+        assert sleeps == []
+
+    def test_gives_up_eventually(self, monkeypatch, sleeps: list[float]) -> None:
+        """Test that persistent server errors are raised after the maximum attempts."""
+        monkeypatch.setattr(httpx, "post", lambda **kwargs: httpx.Response(503, text="unavailable"))
+
+        with pytest.raises(APIRequestError):
+            self._complete()
+        assert len(sleeps) == _MAX_ATTEMPTS - 1
+
+    def test_does_not_retry_read_timeouts(self, monkeypatch, sleeps: list[float]) -> None:
+        """Test that a request that timed out waiting for the response isn't sent (and paid for) again."""
+
+        def timeout(**kwargs):
+            raise httpx.ReadTimeout("timed out")
+
+        monkeypatch.setattr(httpx, "post", timeout)
+
+        with pytest.raises(CompletionApiError):
+            self._complete()
+        assert sleeps == []
+
+    def test_retry_time_bounded(self, monkeypatch, sleeps: list[float]) -> None:
+        """Test that retrying stops once the time budget would be exceeded, even with attempts left."""
+        monkeypatch.setattr("time.monotonic", lambda: sum(sleeps))
+        monkeypatch.setattr(
+            httpx, "post", lambda **kwargs: httpx.Response(429, headers={"Retry-After": "30"}, text="slow down")
+        )
+
+        with pytest.raises(APIRequestError):
+            self._complete()
+        assert sum(sleeps) <= _MAX_RETRY_TIME
+        assert len(sleeps) < _MAX_ATTEMPTS - 1
+
+    def test_retry_delay_bounded(self) -> None:
+        """Test that the backoff and Retry-After are capped."""
+        assert all(0 <= _retry_delay(attempt, None) <= _MAX_RETRY_DELAY for attempt in range(20))
+        assert _retry_delay(0, "3600") == _MAX_RETRY_DELAY
+        assert _retry_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT") <= _MAX_RETRY_DELAY
@@ -0,0 +1,40 @@
+"""Tests for eval.py."""
+
+from ..eval import _order_issues
+from ..output_schemas import EvaluatedTechDebtIssue, EvaluationCriteria
+
+
+def evaluated_issue(title: str, *, impact_score: str, effort: str, objective: bool = True) -> EvaluatedTechDebtIssue:
+    return EvaluatedTechDebtIssue(
+        title=title,
+        short_description="",
+        impact="",
+        recommended_action="",
+        files=[],
+        evaluation=EvaluationCriteria(
+            objective=objective,
+            actionable=True,
+            production=False,
+            local=True,
+            impact_score=impact_score,
+            effort=effort,
+        ),
+    )
+
+
+class TestOrderIssues:
+    """Tests for the _order_issues sort key."""
+
+    def test_priority_then_criteria(self):
+        """Test that issues are ordered by priority score, then by how many criteria they meet."""
+        issues = [
+            evaluated_issue("low priority", impact_score="low", effort="high"),
+            evaluated_issue("subjective", impact_score="high", effort="low", objective=False),
+            evaluated_issue("best", impact_score="high", effort="low"),
+        ]
+        issues.sort(key=_order_issues)
+        assert [issue.title for issue in issues] == ["best", "subjective", "low priority"]
+
+    def test_key(self):
+        """Test the key for a medium impact, medium effort issue meeting three of the four criteria."""
+        assert _order_issues(evaluated_issue("x", impact_score="medium", effort="medium")) == (-4, -3)
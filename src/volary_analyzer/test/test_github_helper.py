@@ -0,0 +1,84 @@
+"""Tests for github_helper.py."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from ..github_helper import _read_origin_url, get_github_client, get_github_repo, github_auth
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    github_auth.cache_clear()
+    get_github_client.cache_clear()
+    yield
+    github_auth.cache_clear()
+    get_github_client.cache_clear()
+
+
+def init_repo(path: Path, remote: str) -> None:
+    subprocess.check_call(["git", "init", "-q", str(path)])
+    subprocess.check_call(["git", "-C", str(path), "remote", "add", "origin", remote])
+
+
+class TestGithubAuth:
+    def test_token_from_env(self, monkeypatch):
+        """Test that the token is read from the environment."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token-1")
+        assert github_auth() == "token-1"
+
+    def test_token_cached(self, monkeypatch):
+        """Test that the token is only resolved once per run."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token-1")
+        github_auth()
+        monkeypatch.setenv("GITHUB_TOKEN", "token-2")
+        assert github_auth() == "token-1"
+
+    def test_client_shared(self, monkeypatch):
+        """Test that the same client is returned on each call."""
+        monkeypatch.setenv("GITHUB_TOKEN", "token-1")
+        assert get_github_client() is get_github_client()
+
+
+class TestGetGithubRepo:
+    """Tests for finding the GitHub repo from the origin remote."""
+
+    def test_reads_git_config(self, tmp_path: Path, monkeypatch) -> None:
+        """Test that the remote is read from .git/config, including from a subdirectory."""
+        init_repo(tmp_path, "git@github.com:owner/repo.git")
+        (tmp_path / "src").mkdir()
+        monkeypatch.chdir(tmp_path / "src")
+        assert _read_origin_url() == "git@github.com:owner/repo.git"
+        assert get_github_repo() == "owner/repo"
+
+    def test_https_remote(self, tmp_path: Path, monkeypatch) -> None:
+        init_repo(tmp_path, "https://github.com/owner/repo")
+        monkeypatch.chdir(tmp_path)
+        assert get_github_repo() == "owner/repo"
+
+    def test_insteadof_falls_back_to_git(self, tmp_path: Path, monkeypatch) -> None:
+        """Test that URL rewrites are left to git rather than applied by us."""
+        init_repo(tmp_path, "gh:owner/repo")
+        subprocess.check_call(
+            ["git", "-C", str(tmp_path), "config", "url.git@github.com:.insteadOf", "gh:"],
+        )
+        monkeypatch.chdir(tmp_path)
+        assert _read_origin_url() is None
+        assert get_github_repo() == "owner/repo"
+
+    def test_global_insteadof_falls_back_to_git(self, tmp_path: Path, monkeypatch) -> None:
+        """Test that URL rewrites from the global config, which we don't read, are still applied."""
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+        (tmp_path / "home").mkdir()
+        subprocess.check_call(["git", "config", "--global", "url.git@github.com:.insteadOf", "gh:"])
+        init_repo(tmp_path / "repo", "gh:owner/repo")
+        monkeypatch.chdir(tmp_path / "repo")
+        assert _read_origin_url() == "gh:owner/repo"
+        assert get_github_repo() == "owner/repo"
+
+    def test_no_origin(self, tmp_path: Path, monkeypatch) -> None:
+        subprocess.check_call(["git", "init", "-q", str(tmp_path)])
+        monkeypatch.chdir(tmp_path)
+        assert get_github_repo() is None
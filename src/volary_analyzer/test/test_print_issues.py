@@ -1,7 +1,13 @@
 """Tests for print_issues.py."""
 
 from ..output_schemas import EvaluatedTechDebtAnalysis, TechDebtAnalysis
-from ..print_issues import render_summary_markdown
+from ..print_issues import (
+    _EVAL_LINES,
+    _EVAL_LINES_MARKDOWN,
+    _format_eval_value,
+    parse_analysis,
+    render_summary_markdown,
+)
 
 
 class TestRenderSummaryMarkdown:
@@ -23,6 +29,15 @@ class TestRenderSummaryMarkdown:
         assert md.endswith("|")
         assert "Evaluation" in md
 
+    def test_eval_has_no_console_markup(self):
+        """Test that the evaluation cell is plain text rather than Rich console markup."""
+        with open("src/volary_analyzer/test/testdata/please-issues-evaluated.json") as f:
+            analysis = EvaluatedTechDebtAnalysis.model_validate_json(f.read())
+        md = render_summary_markdown(analysis)
+        assert "Impact Score: " in md
+        assert "[green]" not in md
+        assert "[/red]" not in md
+
     def test_render_links(self):
         """Test that we can render GitHub source links in the markdown."""
         with open("src/volary_analyzer/test/testdata/minimal-evaluated.json") as f:
@@ -53,3 +68,34 @@ class TestRenderSummaryMarkdown:
         )
         assert "Not a package: crypto/rand.Read" in md
         assert "Also not a package: dev/build" in md
+
+
+class TestParseAnalysis:
+    def test_evaluated(self):
+        """Test that evaluated issues keep their evaluations."""
+        with open("src/volary_analyzer/test/testdata/please-issues-evaluated.json", "rb") as f:
+            analysis = parse_analysis(f.read())
+        assert isinstance(analysis, EvaluatedTechDebtAnalysis)
+
+    def test_not_evaluated(self):
+        """Test that falling back to plain issues works."""
+        with open("src/volary_analyzer/test/testdata/please-issues.json", "rb") as f:
+            analysis = parse_analysis(f.read())
+        assert type(analysis) is TechDebtAnalysis
+        assert analysis.issues
+
+
+class TestFormatEvalValue:
+    def test_console_colours(self):
+        """Test that the console table formatting keeps its colours."""
+        assert _format_eval_value("objective", True) == "[green]Yes[/green]"
+        assert _format_eval_value("impact_score", "high") == "[green]High[/green]"
+        assert _format_eval_value("effort", "high") == "[red]High[/red]"
+
+    def test_eval_lines(self):
+        """Test that a line is pre-rendered for every possible value of every evaluation field."""
+        assert len(_EVAL_LINES) == 4 * 2 + 2 * 3
+        assert _EVAL_LINES["impact_score", "high"] == "Impact Score: [green]High[/green]"
+        assert _EVAL_LINES["local", False] == "Local: [red]No[/red]"
+        assert _EVAL_LINES_MARKDOWN.keys() == _EVAL_LINES.keys()
+        assert _EVAL_LINES_MARKDOWN["effort", "medium"] == "Effort: Medium"
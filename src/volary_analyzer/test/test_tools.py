@@ -3,7 +3,7 @@ from pathlib import Path
 
 import pytest
 
-from ..tools import _should_ignore, grep, ls, read_file
+from ..tools import RepoFileIndex, _should_ignore, grep, ls, read_file
 
 
 class TestReadFile:
@@ -172,6 +172,29 @@ class TestLsFunction:
             os.chdir(original_dir)
 
 
+class TestRepoFileIndex:
+    """Tests for the RepoFileIndex lookup."""
+
+    def test_contains(self, tmp_path: Path) -> None:
+        """Test that existing, non-ignored files are found without listing the repo."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "main.py").write_text("test")
+        (tmp_path / "node_modules").mkdir()
+        (tmp_path / "node_modules" / "dep.js").write_text("test")
+
+        original_dir = os.getcwd()
+        try:
+            os.chdir(tmp_path)
+            files = RepoFileIndex()
+            assert "src/main.py" in files
+            assert "src/missing.py" not in files
+            assert "node_modules/dep.js" not in files
+            assert "../" + tmp_path.name + "/src/main.py" not in files
+            assert None not in files
+        finally:
+            os.chdir(original_dir)
+
+
 class TestGrepFunction:
     """Tests for the grep function."""
 
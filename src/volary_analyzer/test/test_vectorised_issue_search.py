@@ -0,0 +1,111 @@
+"""Tests for vectorised_issue_search.py."""
+
+import datetime
+from types import SimpleNamespace
+
+from ..vectorised_issue_search import (
+    _INDEX_BATCH_SIZE,
+    SharedModelEmbeddingFunction,
+    _get_github_issues,
+    _index_issues,
+)
+
+
+def fake_issue(number: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        number=number,
+        title=f"Issue {number}",
+        body="",
+        state="open",
+        html_url=f"https://github.com/owner/repo/issues/{number}",
+        updated_at=datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC),
+        pull_request=None,
+    )
+
+
+class FakePaginatedList:
+    """Mimics the parts of PyGithub's PaginatedList that we use."""
+
+    def __init__(self, pages: list[list[SimpleNamespace]]):
+        self.pages = pages
+        self.totalCount = sum(len(page) for page in pages)
+
+    def get_page(self, page: int) -> list[SimpleNamespace]:
+        return self.pages[page] if page < len(self.pages) else []
+
+
+class FakeGithub:
+    per_page = 2
+
+    def __init__(self, pages: list[list[SimpleNamespace]]):
+        self.issues = FakePaginatedList(pages)
+
+    def get_repo(self, repo_path: str):
+        return SimpleNamespace(get_issues=lambda state, since: self.issues)
+
+
+class FakeCollection:
+    """Records calls made against a ChromaDB collection."""
+
+    name = "github.com_owner_repo"
+
+    def __init__(self):
+        self.upserts: list[list[str]] = []
+        self.metadata: dict = {}
+
+    def upsert(self, ids, metadatas, documents):
+        self.upserts.append(ids)
+
+    def modify(self, metadata):
+        self.metadata = metadata
+
+
+class TestGetGithubIssues:
+    def test_fetches_all_pages(self):
+        """Test that every page is fetched and the order of issues is kept."""
+        gh = FakeGithub([[fake_issue(5), fake_issue(4)], [fake_issue(3), fake_issue(2)], [fake_issue(1)]])
+        issues = _get_github_issues(gh, "owner/repo", since=None)
+        assert [issue["number"] for issue in issues] == [5, 4, 3, 2, 1]
+
+    def test_dedupes_shifted_pages(self):
+        """Test that an issue that shifts onto a second page is only returned once."""
+        gh = FakeGithub([[fake_issue(3), fake_issue(2)], [fake_issue(2), fake_issue(1)]])
+        issues = _get_github_issues(gh, "owner/repo", since=None)
+        assert [issue["number"] for issue in issues] == [3, 2, 1]
+
+    def test_fetches_pages_past_initial_count(self):
+        """Test that an issue pushed onto a new page by one created after counting isn't missed."""
+        gh = FakeGithub([[fake_issue(4), fake_issue(3)], [fake_issue(2), fake_issue(1)]])
+        gh.issues.pages = [[fake_issue(5), fake_issue(4)], [fake_issue(3), fake_issue(2)], [fake_issue(1)]]
+        issues = _get_github_issues(gh, "owner/repo", since=None)
+        assert [issue["number"] for issue in issues] == [5, 4, 3, 2, 1]
+
+    def test_no_issues(self):
+        gh = FakeGithub([])
+        assert _get_github_issues(gh, "owner/repo", since=None) == []
+
+
+class TestIndexIssues:
+    def test_upserts_in_batches(self):
+        """Test that issues are upserted in bounded batches, covering every issue once."""
+        issues = [
+            {"number": i, "title": f"Issue {i}", "body": None, "state": "open", "html_url": f"https://x/{i}"}
+            for i in range(_INDEX_BATCH_SIZE * 2 + 1)
+        ]
+        collection = FakeCollection()
+        _index_issues(collection, issues)
+
+        assert [len(batch) for batch in collection.upserts] == [_INDEX_BATCH_SIZE, _INDEX_BATCH_SIZE, 1]
+        assert sum(collection.upserts, []) == [f"issue_{i}" for i in range(len(issues))]
+        assert "last_sync" in collection.metadata
+
+
+class TestSharedModelEmbeddingFunction:
+    def test_compatible_with_default(self):
+        """Test that collections created with Chroma's default embedding function accept ours."""
+        assert SharedModelEmbeddingFunction.name() == "default"
+
+    def test_model_dir_from_env(self, monkeypatch):
+        """Test that a pre-downloaded model directory can be provided."""
+        monkeypatch.setenv("VOLARY_EMBEDDING_MODEL_DIR", "/models/minilm")
+        assert SharedModelEmbeddingFunction()._model.DOWNLOAD_PATH == "/models/minilm"
@@ -1,10 +1,11 @@
 import datetime
 import glob as glob_module
+import os
 import subprocess
 from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import chromadb
 import pathspec
 
 from .agent import Agent
@@ -12,6 +13,9 @@ from .completion_api import CompletionApi
 from .prompts import ANALYSIS_DELEGATE_PROMPT, ANALYZER_PROMPT, SEARCH_PROMPT
 from .search import fetch_page_content, web_search
 
+if TYPE_CHECKING:
+    import chromadb
+
 _LS_LIMIT = 100
 _GLOB_LIMIT = 100
 
@@ -49,6 +53,28 @@ def ls_all(glob: str) -> list[str]:
     return sorted(m for m in matches if not _should_ignore(m))
 
 
+class RepoFileIndex:
+    """Answers whether paths exist in the repo (and aren't ignored) on demand.
+
+    This avoids walking the whole tree up front when we only need to check the handful of paths mentioned in issues.
+    """
+
+    def __init__(self):
+        self._known: dict[str, bool] = {}
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, str):
+            return False
+        if path not in self._known:
+            self._known[path] = (
+                not os.path.isabs(path)
+                and ".." not in Path(path).parts
+                and os.path.lexists(path)
+                and not _should_ignore(path)
+            )
+        return self._known[path]
+
+
 def _should_ignore(path: str) -> bool:
     """Check if a path should be ignored based on .gitignore patterns."""
     spec = _get_gitignore_spec()
@@ -185,7 +211,7 @@ def grep(pattern: str, path: str = ".", file_pattern: str = "*") -> str:
         return f"Error executing grep: {str(e)}"
 
 
-def query_issues_factory(collection: chromadb.Collection) -> Callable[[list[str]], str]:
+def query_issues_factory(collection: "chromadb.Collection") -> Callable[[list[str]], str]:
     """
     Creates a query issues tool for semantic search over GitHub issues and PRs.
 
@@ -1,10 +1,40 @@
 import datetime
+import math
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import chromadb
+from chromadb.api.types import DefaultEmbeddingFunction, Documents, Embeddings
+from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
 from github import Github
 from github.GithubObject import NotSet
 
+# Embedding is done per upsert call, this bounds the request size while keeping round trips low
+_INDEX_BATCH_SIZE = 256
+
+# Stay well under GitHub's secondary rate limits on concurrent requests
+_MAX_CONCURRENT_PAGES = 8
+
+
+class SharedModelEmbeddingFunction(DefaultEmbeddingFunction):
+    """
+    Chroma's default embedding function, but loading the model once.
+
+    The stock DefaultEmbeddingFunction creates a new ONNXMiniLM_L6_V2 for every call, which reloads the ONNX session and
+    tokenizer each time we index a batch or run a query. This keeps the "default" name so existing collections accept it.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._model = ONNXMiniLM_L6_V2()
+        # Lets us use a copy of the model baked into the Docker image rather than downloading it on every run
+        if model_dir := os.environ.get("VOLARY_EMBEDDING_MODEL_DIR"):
+            self._model.DOWNLOAD_PATH = model_dir
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self._model(input)
+
 
 def _get_github_issues(gh_client: Github, repo_path: str, since: str | None) -> list[dict]:
     """
@@ -26,10 +56,23 @@ def _get_github_issues(gh_client: Github, repo_path: str, since: str | None) ->
     since_dt = datetime.datetime.fromisoformat(since.replace("Z", "+00:00")) if since else NotSet
     issues = repo.get_issues(state="all", since=since_dt)
 
-    ret = []
-    for issue in issues:
-        # Convert PyGithub Issue object to dict format matching API
-        issue_dict = {
+    # Knowing the total up front lets us fetch every page concurrently rather than following next links one by one.
+    page_count = math.ceil(issues.totalCount / gh_client.per_page)
+    if page_count == 0:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(page_count, _MAX_CONCURRENT_PAGES)) as executor:
+        pages = list(executor.map(issues.get_page, range(page_count)))
+
+    # Issues created while we were fetching push older ones onto pages past the count we started with, so carry on
+    # until we reach the end.
+    while len(pages[-1]) == gh_client.per_page:
+        pages.append(issues.get_page(len(pages)))
+
+    # Convert PyGithub Issue objects to dict format matching API. Key by number since an issue can appear on two pages
+    # if one is created while we're fetching.
+    issues_by_number = {
+        issue.number: {
             "number": issue.number,
             "title": issue.title,
             "body": issue.body,
@@ -37,9 +80,10 @@ def _get_github_issues(gh_client: Github, repo_path: str, since: str | None) ->
             "html_url": issue.html_url,
             "pull_request": {"url": issue.pull_request.url} if issue.pull_request else None,
         }
-        ret.append(issue_dict)
-
-    return ret
+        for page in pages
+        for issue in page
+    }
+    return list(issues_by_number.values())
 
 
 def _index_issues(collection: chromadb.Collection, issues: list[dict]) -> None:
@@ -73,12 +117,15 @@ def _index_issues(collection: chromadb.Collection, issues: list[dict]) -> None:
             }
         )
 
-    # Upsert documents (update existing, add new)
-    collection.upsert(
-        ids=ids,
-        metadatas=metadata,
-        documents=documents,
-    )
+    # Upsert documents (update existing, add new) in batches. A single call for large repos can exceed the maximum
+    # batch size Chroma accepts.
+    for start in range(0, len(ids), _INDEX_BATCH_SIZE):
+        end = start + _INDEX_BATCH_SIZE
+        collection.upsert(
+            ids=ids[start:end],
+            metadatas=metadata[start:end],
+            documents=documents[start:end],
+        )
 
     # Update sync timestamp in collection metadata
     current_time = datetime.datetime.now(datetime.UTC).isoformat()
@@ -101,7 +148,9 @@ def github_vector_db(chroma_client: chromadb.ClientAPI, gh_client: Github, repo_
     """
     print(f"Indexing GitHub issues for {repo_path}...", file=sys.stderr)
     collection_name = f"github.com_{repo_path.replace('/', '_')}"
-    collection = chroma_client.get_or_create_collection(collection_name)
+    collection = chroma_client.get_or_create_collection(
+        collection_name, embedding_function=SharedModelEmbeddingFunction()
+    )
     collection_meta = collection.metadata or {}
     last_sync = collection_meta.get("last_sync")
     issues = _get_github_issues(gh_client=gh_client, repo_path=repo_path, since=last_sync)